@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import os
 import typing as t
 
 import sqlalchemy as sa
 from flask import Flask
 from flask_alembic import Alembic
+from jinja2 import FileSystemBytecodeCache
 from sqlalchemy import orm
 
 from flask_sqlalchemy_lite import SQLAlchemy
@@ -39,6 +41,11 @@ def create_app(test_config: dict[str, t.Any] | None = None) -> Flask:
     if test_config is None:  # pragma: no cover
         # load config from env vars when not testing
         app.config.from_prefixed_env()
+        # cache compiled templates in the instance folder so new worker
+        # processes don't need to parse them again
+        cache_dir = os.path.join(app.instance_path, "jinja_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
     else:
         # load the test config if passed in
         app.testing = True
@@ -48,6 +55,12 @@ def create_app(test_config: dict[str, t.Any] | None = None) -> Flask:
     db.init_app(app)
     alembic.init_app(app)
 
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name == "sqlite":
+        sa.event.listen(engine, "connect", _set_sqlite_pragmas)
+
     # apply the blueprints to the app
     from flaskr import auth
     from flaskr import blog
@@ -62,3 +75,13 @@ def create_app(test_config: dict[str, t.Any] | None = None) -> Flask:
     app.add_url_rule("/", endpoint="index")
 
     return app
+
+
+def _set_sqlite_pragmas(dbapi_connection: t.Any, connection_record: t.Any) -> None:
+    """Use write-ahead logging for SQLite, so that commits don't need to sync
+    the whole database file to disk.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
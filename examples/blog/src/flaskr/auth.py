@@ -6,6 +6,7 @@ import typing as t
 
 import sqlalchemy as sa
 from flask import Blueprint
+from flask import current_app
 from flask import flash
 from flask import g
 from flask import redirect
@@ -37,13 +38,27 @@ class User(Model):
     posts: orm.Mapped[list[Post]] = orm.relationship(back_populates="author")
 
     def set_password(self, value: str) -> None:
-        """Store the password as a hash for security."""
-        self.password_hash = generate_password_hash(value)
+        """Store the password as a hash for security. The hash method can be
+        tuned for the deployment with the ``PASSWORD_HASH_METHOD`` config, such
+        as ``"scrypt:32768:8:1"`` or ``"pbkdf2:sha256:600000"``.
+        """
+        self.password_hash = generate_password_hash(
+            value, method=current_app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+        )
 
     def check_password(self, value: str) -> bool:
         return check_password_hash(self.password_hash, value)
 
 
+# built once so each request reuses the same statement and its cached compilation
+_user_by_name: sa.Select[tuple[User]] = sa.select(User).where(
+    User.username == sa.bindparam("username")
+)
+_username_exists: sa.Select[tuple[bool]] = sa.select(
+    sa.exists().where(User.username == sa.bindparam("username"))
+)
+
+
 def login_required(view: F) -> F:
     """View decorator that redirects anonymous users to the login page."""
 
@@ -60,7 +75,12 @@ def login_required(view: F) -> F:
 @bp.before_app_request
 def load_logged_in_user() -> None:
     """If a user id is stored in the session, load the user object from
-    the database into ``g.user``."""
+    the database into ``g.user``. Static files don't need the user at all.
+    """
+    if request.endpoint == "static":
+        g.user = None
+        return
+
     user_id = session.get("user_id")
 
     if user_id is None:
@@ -90,7 +110,7 @@ def register_submit() -> Response | str:
         error = "Username is required."
     elif not password:
         error = "Password is required."
-    elif db.session.scalar(sa.select(User).where(User.username == username)):
+    elif db.session.scalar(_username_exists, {"username": username}):
         error = f"User {username} is already registered."
 
     if error is not None:
@@ -116,7 +136,7 @@ def login_submit() -> Response | str:
     username = request.form["username"]
     password = request.form["password"]
     error = None
-    user = db.session.scalar(sa.select(User).where(User.username == username))
+    user = db.session.scalar(_user_by_name, {"username": username})
 
     if user is None:
         error = "Incorrect username."
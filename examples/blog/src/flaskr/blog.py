@@ -27,16 +27,12 @@ class Post(Model):
     __tablename__ = "post"
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     author_id: orm.Mapped[int] = orm.mapped_column(sa.ForeignKey("user.id"))
-    # lazy="joined" means the user is returned with the post in one query
-    author: orm.Mapped[User] = orm.relationship(lazy="joined", back_populates="posts")
+    # the author is loaded separately when accessed
+    author: orm.Mapped[User] = orm.relationship(back_populates="posts")
     created: orm.Mapped[datetime] = orm.mapped_column(default=lambda: datetime.now(UTC))
     title: orm.Mapped[str]
     body: orm.Mapped[str]
 
-    @property
-    def update_url(self) -> str:
-        return url_for("blog.update", id=self.id)
-
     @property
     def delete_url(self) -> str:
         return url_for("blog.delete", id=self.id)
@@ -44,13 +40,30 @@ class Post(Model):
 
 @bp.get("/")
 def index() -> str:
-    """Show all the posts, most recent first."""
-    posts = db.session.scalars(sa.select(Post).order_by(Post.created.desc()))
+    """Show all the posts, most recent first.
+
+    Only the columns the page shows are selected, as plain rows rather than
+    ORM objects. Rows are fetched in batches as the template iterates over
+    them, rather than loading every post up front.
+    """
+    posts = db.session.execute(
+        sa.select(
+            Post.id,
+            Post.title,
+            Post.body,
+            Post.created,
+            Post.author_id,
+            User.username,
+        )
+        .join(Post.author)
+        .order_by(Post.created.desc())
+        .execution_options(yield_per=100)
+    )
     return render_template("blog/index.html", posts=posts)
 
 
 def get_post(id: int, check_author: bool = True) -> Post:
-    """Get a post and its author by id.
+    """Get a post by id. The author is loaded when first accessed.
 
     Checks that the id exists and optionally that the current user is
     the author.
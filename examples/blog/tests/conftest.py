@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import collections.abc as c
+import typing as t
 from datetime import datetime
 from datetime import UTC
+from unittest import mock
 
 import pytest
+import sqlalchemy as sa
 from flask import Flask
 from flask.testing import FlaskClient
 from flaskr import create_app
@@ -12,37 +15,85 @@ from flaskr import db
 from flaskr import Model
 from flaskr.auth import User
 from flaskr.blog import Post
+from werkzeug.security import generate_password_hash
 from werkzeug.test import TestResponse
 
+# hashing is slow, so only do it once rather than for every test
+_test_hash = generate_password_hash("test")
+_other_hash = generate_password_hash("other")
 
-@pytest.fixture
-def app() -> c.Iterator[Flask]:
+
+@pytest.fixture(scope="session")
+def _app() -> c.Iterator[Flask]:
+    """Create the app and test data once for the whole test session. Use the
+    ``app`` fixture instead, which isolates changes to each test.
+    """
     # create the app with test config
     app = create_app({"SQLALCHEMY_ENGINES": {"default": "sqlite://"}})
 
+    with app.app_context():
+        engine = db.engine
+
+    # let SQLAlchemy control transactions, so that savepoints work with sqlite3
+    sa.event.listen(engine, "connect", _sqlite_connect)
+    sa.event.listen(engine, "begin", _sqlite_begin)
+
     # create the database and load test data
     with app.app_context():
-        Model.metadata.create_all(db.engine)
-        user1 = User(username="test")
-        user1.set_password("test")
-        db.session.add(user1)
-        user2 = User(username="other")
-        user2.set_password("other")
-        db.session.add(user2)
-        db.session.add(
-            Post(
-                title="test title",
-                body="test\nbody",
-                author=user1,
-                created=datetime(2018, 1, 1, tzinfo=UTC),
-            )
+        Model.metadata.create_all(engine)
+        user_ids = db.session.scalars(
+            sa.insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {"username": "test", "password_hash": _test_hash},
+                {"username": "other", "password_hash": _other_hash},
+            ],
+        ).all()
+        db.session.execute(
+            sa.insert(Post),
+            [
+                {
+                    "title": "test title",
+                    "body": "test\nbody",
+                    "author_id": user_ids[0],
+                    "created": datetime(2018, 1, 1, tzinfo=UTC),
+                }
+            ],
         )
         db.session.commit()
 
     yield app
 
-    with app.app_context():
-        db.engine.dispose()
+    engine.dispose()
+
+
+def _sqlite_connect(dbapi_connection: t.Any, connection_record: t.Any) -> None:
+    # disable the sqlite3 module's own transaction handling
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(connection: sa.Connection) -> None:
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture
+def app(_app: Flask) -> c.Iterator[Flask]:
+    """Run each test inside a transaction that is rolled back at the end. Any
+    commits during the test only release a savepoint within it.
+    """
+    with _app.app_context():
+        engine = db.engine
+        sessionmaker = db.sessionmaker
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+
+        with mock.patch.dict(
+            sessionmaker.kw,
+            {"bind": connection, "join_transaction_mode": "create_savepoint"},
+        ):
+            yield _app
+
+        transaction.rollback()
 
 
 @pytest.fixture
@@ -82,3 +82,25 @@ def test_logout(client: FlaskClient, auth: AuthActions) -> None:
     with client:
         auth.logout()
         assert "user_id" not in session
+
+
+def test_static_skips_user(client: FlaskClient, auth: AuthActions) -> None:
+    auth.login()
+
+    with client:
+        client.get("/static/style.css").close()
+        assert g.user is None
+
+
+def test_deleted_user_logged_out(
+    app: Flask, client: FlaskClient, auth: AuthActions
+) -> None:
+    auth.login()
+
+    with app.app_context():
+        db.session.execute(sa.delete(User).where(User.username == "test"))
+        db.session.commit()
+
+    # the user id in the cookie no longer matches a user
+    response = client.post("/create", data={"title": "created", "body": ""})
+    assert response.headers["Location"] == "/auth/login"
@@ -18,6 +18,18 @@ app.config["SQLALCHEMY_ENGINES"] = {"default": "sqlite:///todo.sqlite"}
 db = SQLAlchemy(app)
 
 
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use write-ahead logging so commits don't sync the whole file to disk."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+with app.app_context():
+    sa.event.listen(db.engine, "connect", set_sqlite_pragmas)
+
+
 class Model(orm.DeclarativeBase):
     pass
 
@@ -68,9 +80,14 @@ def submit_new():
 
 @app.post("/update")
 def update_done():
-    for todo in db.session.execute(sa.select(Todo)).scalars():
-        todo.done = f"done.{todo.id}" in request.form
-
+    # match the ids exactly as the form sent them, so unrecognized keys such
+    # as "done.x" are ignored rather than parsed
+    done_ids = [
+        key.removeprefix("done.") for key in request.form if key.startswith("done.")
+    ]
+    db.session.execute(
+        sa.update(Todo).values(done=sa.cast(Todo.id, sa.String).in_(done_ids))
+    )
     flash("Updated status")
     db.session.commit()
     return redirect(url_for("show_all"))
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import collections.abc as c
+
+import pytest
+import sqlalchemy as sa
+from app import app
+from app import db
+from app import Model
+from app import Todo
+from flask.testing import FlaskClient
+
+
+@pytest.fixture
+def client() -> c.Iterator[FlaskClient]:
+    """Use a separate in-memory database with two todos, rather than the
+    app's database file.
+    """
+    engine = sa.create_engine("sqlite://", poolclass=sa.pool.StaticPool)
+    Model.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.insert(Todo),
+            [
+                {"id": 1, "title": "a", "text": "a"},
+                {"id": 2, "title": "b", "text": "b"},
+            ],
+        )
+
+    with app.app_context():
+        sessionmaker = db.sessionmaker
+
+    sessionmaker.configure(bind=engine)
+    yield app.test_client()
+
+    with app.app_context():
+        sessionmaker.configure(bind=db.engine)
+
+    engine.dispose()
+
+
+def get_done() -> set[int]:
+    with app.app_context():
+        return set(db.session.scalars(sa.select(Todo.id).where(Todo.done)))
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "done.x",
+        "done.",
+        # out of range for an integer column
+        "done.99999999999999999999999",
+        # a non-ASCII digit is not the id 1
+        "done.١",
+        # leading zeros are not the id 1
+        "done.01",
+    ],
+)
+def test_update_ignores_invalid_keys(client: FlaskClient, key: str) -> None:
+    response = client.post("/update", data={key: "on", "done.2": "on"})
+    assert response.status_code == 302
+    assert get_done() == {2}
@@ -1,19 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import typing as t
 from dataclasses import dataclass
-from weakref import WeakKeyDictionary
+from types import MappingProxyType
 
 import sqlalchemy as sa
-import sqlalchemy.ext.asyncio as sa_async
 import sqlalchemy.orm as orm
 from flask import current_app
 from flask import g
 from flask.sansio.app import App
 
 from ._cli import add_models_to_shell
+from ._make import _check_binds
 from ._make import _make_engines
 from ._make import _make_sessionmaker
+from ._make import _warm_pools
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    import sqlalchemy.ext.asyncio as sa_async
+
+# Shared by instances that weren't passed options. The options are only read.
+_empty_options: t.Mapping[str, t.Any] = MappingProxyType({})
 
 
 class SQLAlchemy:
@@ -25,6 +33,9 @@ class SQLAlchemy:
     :param engine_options: Default arguments passed to
         :func:`sqlalchemy.create_engine` for each configured engine.
     :param session_options: Arguments to configure :attr:`sessionmaker` with.
+    :param warm_pools: Fill each sync engine's queue pool with connections
+        during :meth:`init_app`, so that the first requests don't need to
+        connect.
     """
 
     def __init__(
@@ -34,17 +45,23 @@ class SQLAlchemy:
         require_default_engine: bool = True,
         engine_options: dict[str, t.Any] | None = None,
         session_options: dict[str, t.Any] | None = None,
+        warm_pools: bool = False,
     ) -> None:
-        if engine_options is None:
-            engine_options = {}
-
-        if session_options is None:
-            session_options = {}
-
         self._require_default_engine: bool = require_default_engine
-        self._engine_options: dict[str, t.Any] = engine_options
-        self._session_options: dict[str, t.Any] = session_options
-        self._app_state: WeakKeyDictionary[App, _State] = WeakKeyDictionary()
+        # Copy the options into read-only mappings, so that changes to the
+        # passed dicts don't affect later calls to init_app. This is a shallow
+        # copy, nested values are still shared.
+        self._engine_options: t.Mapping[str, t.Any] = (
+            MappingProxyType(dict(engine_options))
+            if engine_options is not None
+            else _empty_options
+        )
+        self._session_options: t.Mapping[str, t.Any] = (
+            MappingProxyType(dict(session_options))
+            if session_options is not None
+            else _empty_options
+        )
+        self._warm_pools: bool = warm_pools
 
         if app is not None:
             self.init_app(app)
@@ -70,30 +87,60 @@ class SQLAlchemy:
                 " 'SQLALCHEMY_ASYNC_ENGINES[\"default\"]' must be defined."
             )
 
-        self._app_state[app] = _State(
+        _check_binds(self._session_options, engines, async_engines)
+
+        if self._warm_pools:
+            # Warm the pools before registering anything on the app, so that
+            # init_app can be called again if connecting fails. Async engines
+            # are not warmed, so they have no connections to close.
+            try:
+                _warm_pools(engines)
+            except Exception:
+                for engine in engines.values():
+                    engine.dispose()
+
+                raise
+
+        sessionmaker = _make_sessionmaker(self._session_options, engines, False)
+        # Avoid importing SQLAlchemy's asyncio support if it's not used. The
+        # async sessionmaker will be created on first access instead.
+        async_sessionmaker = None
+
+        if async_engines:
+            async_sessionmaker = _make_sessionmaker(
+                self._session_options, async_engines, True
+            )
+
+        app.extensions["_sqlalchemy_state"] = _State(
             engines=engines,
-            sessionmaker=_make_sessionmaker(self._session_options, engines, False),
+            sessionmaker=sessionmaker,
             async_engines=async_engines,
-            async_sessionmaker=_make_sessionmaker(
-                self._session_options, async_engines, True
-            ),
+            async_sessionmaker=async_sessionmaker,
         )
         app.extensions["sqlalchemy"] = self
         app.teardown_appcontext(_close_sessions)
-        app.teardown_appcontext(_close_async_sessions)
         app.shell_context_processor(add_models_to_shell)
 
     def _get_state(self) -> _State:
-        app = current_app._get_current_object()  # type: ignore[attr-defined]
+        # The state is cached on g for the rest of the app context, along with
+        # this instance so that another instance doesn't use it.
+        cached: tuple[SQLAlchemy, _State] | None = g.get("_sqlalchemy_state")
 
-        if app not in self._app_state:
+        if cached is not None and cached[0] is self:
+            return cached[1]
+
+        extensions = current_app.extensions
+
+        if extensions.get("sqlalchemy") is not self:
             raise RuntimeError(
                 "The current Flask app is not registered with this 'SQLAlchemy'"
                 " instance. Did you forget to call 'init_app', or did you"
                 " create multiple 'SQLAlchemy' instances?"
             )
 
-        return self._app_state[app]
+        state: _State = extensions["_sqlalchemy_state"]
+        g._sqlalchemy_state = (self, state)
+        return state
 
     @property
     def engines(self) -> dict[str, sa.Engine]:
@@ -108,10 +155,12 @@ class SQLAlchemy:
 
         :param name: The name associated with the engine.
         """
-        try:
-            return self.engines[name]
-        except KeyError as e:
-            raise KeyError(f"'SQLALCHEMY_ENGINES[\"{name}\"]' was not defined.") from e
+        engine = self.engines.get(name)
+
+        if engine is None:
+            raise KeyError(f"'SQLALCHEMY_ENGINES[\"{name}\"]' was not defined.")
+
+        return engine
 
     @property
     def engine(self) -> sa.Engine:
@@ -141,12 +190,18 @@ class SQLAlchemy:
 
         :param name: A unique name for caching the session.
         """
-        sessions: dict[str, orm.Session] = g.setdefault("_sqlalchemy_sessions", {})
+        # Only create the dict once, rather than passing a new one to setdefault
+        # on every call.
+        sessions: dict[str, orm.Session] | None = g.get("_sqlalchemy_sessions")
 
-        if name not in sessions:
-            sessions[name] = self.sessionmaker()
+        if sessions is None:
+            sessions = g._sqlalchemy_sessions = {}
 
-        return sessions[name]
+        try:
+            return sessions[name]
+        except KeyError:
+            session = sessions[name] = self._get_state().sessionmaker()
+            return session
 
     @property
     def session(self) -> orm.Session:
@@ -168,12 +223,12 @@ class SQLAlchemy:
 
         :param name: The name associated with the engine.
         """
-        try:
-            return self.async_engines[name]
-        except KeyError as e:
-            raise KeyError(
-                f"'SQLALCHEMY_ASYNC_ENGINES[\"{name}\"]' was not defined."
-            ) from e
+        engine = self.async_engines.get(name)
+
+        if engine is None:
+            raise KeyError(f"'SQLALCHEMY_ASYNC_ENGINES[\"{name}\"]' was not defined.")
+
+        return engine
 
     @property
     def async_engine(self) -> sa_async.AsyncEngine:
@@ -196,13 +251,21 @@ class SQLAlchemy:
         :meth:`init_app`, by calling its
         :meth:`~sqlalchemy.ext.asyncio.async_sessionmaker.configure` method.
         """
-        return self._get_state().async_sessionmaker
+        state = self._get_state()
+
+        if state.async_sessionmaker is None:
+            state.async_sessionmaker = _make_sessionmaker(
+                self._session_options, state.async_engines, True
+            )
+
+        return state.async_sessionmaker
 
     def get_async_session(self, name: str = "default") -> sa_async.AsyncSession:
         """Create a :class:`sqlalchemy.ext.asyncio.AsyncSession` that will be
-        closed at the end of the application context. Repeated calls with the
-        same name within the same application context will return the same
-        session.
+        closed at the end of the application context. A session that is not in
+        a transaction and holds no objects is dropped without closing, as it
+        holds no connection. Repeated calls with the same name within the same
+        application context will return the same session.
 
         The :attr:`async_session` attribute is a shortcut for calling this
         without an argument to get the default async session.
@@ -214,19 +277,24 @@ class SQLAlchemy:
 
         :param name: A unique name for caching the session.
         """
-        sessions: dict[str, sa_async.AsyncSession] = g.setdefault(
-            "_sqlalchemy_async_sessions", {}
+        sessions: dict[str, sa_async.AsyncSession] | None = g.get(
+            "_sqlalchemy_async_sessions"
         )
 
-        if name not in sessions:
-            sessions[name] = self.async_sessionmaker()
+        if sessions is None:
+            sessions = g._sqlalchemy_async_sessions = {}
 
-        return sessions[name]
+        try:
+            return sessions[name]
+        except KeyError:
+            session = sessions[name] = self.async_sessionmaker()
+            return session
 
     @property
     def async_session(self) -> sa_async.AsyncSession:
         """The default async session for the current application context. It
-        will be closed when the context ends.
+        will be closed when the context ends, unless it is not in a transaction
+        and holds no objects, in which case it is dropped without closing.
         """
         return self.get_async_session()
 
@@ -235,31 +303,64 @@ class SQLAlchemy:
 class _State:
     """The objects associated with one application."""
 
+    # dataclass(slots=True) requires Python 3.10
+    __slots__ = ("engines", "sessionmaker", "async_engines", "async_sessionmaker")
+
     engines: dict[str, t.Any]
     sessionmaker: orm.sessionmaker[orm.Session]
     async_engines: dict[str, t.Any]
-    async_sessionmaker: sa_async.async_sessionmaker[sa_async.AsyncSession]
+    async_sessionmaker: sa_async.async_sessionmaker[sa_async.AsyncSession] | None
 
 
 def _close_sessions(e: BaseException | None) -> None:
-    """Close any tracked sessions when the application context ends."""
-    sessions: dict[str, orm.Session] = g.pop("_sqlalchemy_sessions", None)
-
-    if sessions is None:
-        return
-
-    for session in sessions.values():
-        session.close()
-
+    """Close any tracked sync and async sessions when the application context
+    ends.
 
-async def _close_async_sessions(e: BaseException | None) -> None:
-    """Close any tracked async sessions when the application context ends."""
-    sessions: dict[str, sa_async.AsyncSession] = g.pop(
+    This is a sync function so that Flask doesn't need to run an event loop
+    during teardown unless there are async sessions to close.
+    """
+    sessions: dict[str, orm.Session] | None = g.pop("_sqlalchemy_sessions", None)
+    async_sessions: dict[str, sa_async.AsyncSession] | None = g.pop(
         "_sqlalchemy_async_sessions", None
     )
+    # Close every session even if one fails, so that no connections are left
+    # checked out from the pool. Then raise the first error.
+    errors: list[Exception] = []
+
+    if sessions is not None:
+        for session in sessions.values():
+            try:
+                session.close()
+            except Exception as e:
+                errors.append(e)
+
+    if async_sessions is not None:
+        # An async session that is not in a transaction holds no connection. If
+        # it also holds no objects, closing it would only run the event loop
+        # for nothing. Sessions with objects are still closed so that the
+        # objects are detached from it.
+        used = [
+            s for s in async_sessions.values() if s.in_transaction() or s.identity_map
+        ]
+
+        if used:
+            try:
+                current_app.ensure_sync(_close_async_sessions)(used)
+            except Exception as e:
+                errors.append(e)
+
+    if errors:
+        raise errors[0]
+
+
+async def _close_async_sessions(sessions: list[sa_async.AsyncSession]) -> None:
+    """Close async sessions concurrently. Raise the first error after all
+    sessions are closed.
+    """
+    results = await asyncio.gather(
+        *(session.close() for session in sessions), return_exceptions=True
+    )
 
-    if sessions is None:
-        return
-
-    for session in sessions.values():
-        await session.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
@@ -2,43 +2,50 @@ from __future__ import annotations
 
 import os
 import typing as t
+from contextlib import ExitStack
 
 import sqlalchemy as sa
 from flask.sansio.app import App
 from sqlalchemy import orm as orm
-from sqlalchemy.ext import asyncio as sa_async
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.ext import asyncio as sa_async
 
 
 @t.overload
 def _make_engines(  # pragma: no cover
-    app: App, base: dict[str, t.Any], is_async: t.Literal[False]
+    app: App, base: t.Mapping[str, t.Any], is_async: t.Literal[False]
 ) -> dict[str, sa.Engine]: ...
 
 
 @t.overload
 def _make_engines(  # pragma: no cover
-    app: App, base: dict[str, t.Any], is_async: t.Literal[True]
+    app: App, base: t.Mapping[str, t.Any], is_async: t.Literal[True]
 ) -> dict[str, sa_async.AsyncEngine]: ...
 
 
-def _make_engines(app: App, base: dict[str, t.Any], is_async: bool) -> dict[str, t.Any]:
+def _make_engines(
+    app: App, base: t.Mapping[str, t.Any], is_async: bool
+) -> dict[str, t.Any]:
     """Create the collection of sync or async engines from app config.
 
     :param app: The Flask application being registered.
     :param base: The default options passed to the extension.
     :param is_async: Whether to create sync or async engines.
     """
+    config_key = "SQLALCHEMY_ENGINES" if not is_async else "SQLALCHEMY_ASYNC_ENGINES"
+    engine_configs: dict[str, dict[str, t.Any]] | None = app.config.get(config_key)
+
+    if not engine_configs:
+        return {}
+
     if not is_async:
-        config_key = "SQLALCHEMY_ENGINES"
         make: t.Callable[..., t.Any] = sa.engine_from_config
     else:
-        config_key = "SQLALCHEMY_ASYNC_ENGINES"
-        make = sa_async.async_engine_from_config
-
-    engine_configs: dict[str, dict[str, t.Any]] = app.config.get(config_key, {})
+        # Only import asyncio support if async engines are configured.
+        from sqlalchemy.ext.asyncio import async_engine_from_config
 
-    if not engine_configs:
-        return {}
+        make = async_engine_from_config
 
     return {
         name: make(
@@ -52,7 +59,7 @@ def _make_engines(app: App, base: dict[str, t.Any], is_async: bool) -> dict[str,
 def _prepare_engine_options(
     app: App,
     config_name: str,
-    base: dict[str, t.Any],
+    base: t.Mapping[str, t.Any],
     engine_config: str | sa.URL | dict[str, t.Any],
 ) -> dict[str, t.Any]:
     """Prepare the arguments to be passed to ``create_engine``. Combine default
@@ -64,12 +71,13 @@ def _prepare_engine_options(
     :param engine_config: The app config for this named engine.
     """
     if isinstance(engine_config, (str, sa.URL)):
-        options = base.copy()
+        options = dict(base)
         options["url"] = engine_config
     elif "url" not in engine_config:
         raise RuntimeError(f"'{config_name}[\"url\"]' must be defined.")
     else:
-        options = base | engine_config
+        options = dict(base)
+        options.update(engine_config)
 
     url_value: str | sa.URL | dict[str, t.Any] = options["url"]
 
@@ -78,70 +86,173 @@ def _prepare_engine_options(
     else:
         url = sa.make_url(url_value)
 
-    backend = url.get_backend_name()
-    driver = url.get_driver_name()
-
     # For certain backends, apply better defaults for a web app.
-    if backend == "sqlite":
-        if url.database is None or url.database in {"", ":memory:"}:
-            # Use a static pool so each connection is to the same in-memory database.
-            options["poolclass"] = sa.pool.StaticPool
-
-            if driver == "pysqlite":
-                # Allow sharing the connection across threads for the
-                # built-in sqlite3 module.
-                connect_args = options.setdefault("connect_args", {})
-                connect_args["check_same_thread"] = False
-        else:
-            # The path could be sqlite:///path or sqlite:///file:path?uri=true.
-            is_uri = url.query.get("uri", False)
-
-            if is_uri:
-                db_str = url.database[5:]
-            else:
-                db_str = url.database
-
-            if not os.path.isabs(db_str):
-                # Relative paths are relative to the app's instance path. Create
-                # it if it doesn't exist.
-                os.makedirs(app.instance_path, exist_ok=True)
-                db_str = os.path.join(app.instance_path, db_str)
-
-                if is_uri:
-                    db_str = f"file:{db_str}"
-
-                url = url.set(database=db_str)
-    elif backend == "mysql":  # pragma: no branch
-        # Set queue defaults only when using a queue pool.
-        # issubclass is used to handle AsyncAdaptedQueuePool as well.
-        if "poolclass" not in options or issubclass(
-            options["poolclass"], sa.pool.QueuePool
-        ):
-            options.setdefault("pool_recycle", 7200)
-
-        if "charset" not in url.query:
-            url = url.update_query_dict({"charset": "utf8mb4"})
+    apply_defaults = _backend_defaults.get(url.get_backend_name())
+
+    if apply_defaults is not None:
+        url = apply_defaults(app, url, options)
+
+    # Prefer the most recently used connection, so that idle connections beyond
+    # what the current load needs can time out instead of being cycled through.
+    if _uses_queue_pool(url, options):
+        options.setdefault("pool_use_lifo", True)
 
     options["url"] = url
     return options
 
 
+def _apply_sqlite_defaults(app: App, url: sa.URL, options: dict[str, t.Any]) -> sa.URL:
+    """Use a static pool for in-memory databases, and make relative file paths
+    relative to the app's instance path.
+
+    :param app: The Flask application being registered.
+    :param url: The engine's URL.
+    :param options: The engine options, which will be modified.
+    """
+    if url.database in {None, "", ":memory:"}:
+        # Use a static pool so each connection is to the same in-memory database.
+        options["poolclass"] = sa.pool.StaticPool
+
+        if url.get_driver_name() == "pysqlite":
+            # Allow sharing the connection across threads for the built-in
+            # sqlite3 module. Copy the arguments rather than modifying the dict
+            # from the options or config.
+            connect_args = options["connect_args"] = dict(
+                options.get("connect_args", ())
+            )
+            connect_args.setdefault("check_same_thread", False)
+
+        return url
+
+    # The path could be sqlite:///path or sqlite:///file:path?uri=true.
+    is_uri = url.query.get("uri", False)
+
+    if is_uri:
+        db_str = url.database[5:]
+    else:
+        db_str = url.database
+
+    if os.path.isabs(db_str):
+        return url
+
+    # Relative paths are relative to the app's instance path. Create it if it
+    # doesn't exist.
+    os.makedirs(app.instance_path, exist_ok=True)
+    db_str = os.path.join(app.instance_path, db_str)
+
+    if is_uri:
+        db_str = f"file:{db_str}"
+
+    return url.set(database=db_str)
+
+
+def _apply_mysql_defaults(app: App, url: sa.URL, options: dict[str, t.Any]) -> sa.URL:
+    """Recycle queue pool connections before the server's timeout, and use the
+    full utf8mb4 charset.
+
+    :param app: The Flask application being registered.
+    :param url: The engine's URL.
+    :param options: The engine options, which will be modified.
+    """
+    # Set queue defaults only when using a queue pool.
+    if _uses_queue_pool(url, options):
+        options.setdefault("pool_recycle", 7200)
+
+    if "charset" not in url.query:
+        url = url.update_query_dict({"charset": "utf8mb4"})
+
+    return url
+
+
+# Backend name to a function that applies defaults for it. Other backends use
+# SQLAlchemy's defaults.
+_backend_defaults: dict[str, t.Callable[[App, sa.URL, dict[str, t.Any]], sa.URL]] = {
+    "sqlite": _apply_sqlite_defaults,
+    "mysql": _apply_mysql_defaults,
+}
+
+
+def _uses_queue_pool(url: sa.URL, options: dict[str, t.Any]) -> bool:
+    """Whether the engine will use a queue pool, either configured or the
+    dialect's default. Queue specific options can only be passed in that case.
+
+    :param url: The engine's URL.
+    :param options: The prepared engine options.
+    """
+    if "pool" in options:
+        return False
+
+    poolclass: type[sa.pool.Pool] | None = options.get("poolclass")
+
+    if poolclass is None:
+        poolclass = url.get_dialect().get_pool_class(url)  # type: ignore[attr-defined]
+
+    # issubclass is used to handle AsyncAdaptedQueuePool as well.
+    return issubclass(poolclass, sa.pool.QueuePool)
+
+
+def _warm_pools(engines: dict[str, sa.Engine]) -> None:
+    """Open connections until each queue pool is at its configured size, then
+    return them to the pool.
+
+    :param engines: The collection of sync engines.
+    """
+    for engine in engines.values():
+        pool = engine.pool
+
+        if not isinstance(pool, sa.pool.QueuePool):
+            continue
+
+        # Close the connections that were opened even if a later one fails.
+        with ExitStack() as stack:
+            for _ in range(pool.size()):
+                stack.enter_context(engine.connect())
+
+
+def _check_binds(
+    base: t.Mapping[str, t.Any],
+    engines: dict[str, sa.Engine],
+    async_engines: dict[str, sa_async.AsyncEngine],
+) -> None:
+    """Check that each engine name in the ``binds`` session option is configured
+    as a sync or async engine.
+
+    :param base: The session options passed to the extension.
+    :param engines: The collection of sync engines.
+    :param async_engines: The collection of async engines.
+    """
+    binds: dict[t.Any, t.Any] | None = base.get("binds")
+
+    if not binds:
+        return
+
+    for bind in binds.values():
+        if isinstance(bind, str) and bind not in engines and bind not in async_engines:
+            raise RuntimeError(
+                f"Neither 'SQLALCHEMY_ENGINES[\"{bind}\"]' nor"
+                f" 'SQLALCHEMY_ASYNC_ENGINES[\"{bind}\"]' is defined, but it is"
+                " used in 'session_options[\"binds\"]'."
+            )
+
+
 @t.overload
 def _make_sessionmaker(  # pragma: no cover
-    base: dict[str, t.Any], engines: dict[str, sa.Engine], is_async: t.Literal[False]
+    base: t.Mapping[str, t.Any],
+    engines: dict[str, sa.Engine],
+    is_async: t.Literal[False],
 ) -> orm.sessionmaker[orm.Session]: ...
 
 
 @t.overload
 def _make_sessionmaker(  # pragma: no cover
-    base: dict[str, t.Any],
+    base: t.Mapping[str, t.Any],
     engines: dict[str, sa_async.AsyncEngine],
     is_async: t.Literal[True],
 ) -> sa_async.async_sessionmaker[sa_async.AsyncSession]: ...
 
 
 def _make_sessionmaker(
-    base: dict[str, t.Any], engines: dict[str, t.Any], is_async: bool
+    base: t.Mapping[str, t.Any], engines: dict[str, t.Any], is_async: bool
 ) -> t.Any:
     """Create the sync or async sessionmaker for the extension. Apply engines
     to the ``bind`` and ``binds`` parameters.
@@ -151,26 +262,37 @@ def _make_sessionmaker(
     :param is_async: Whether to create a sync or async sessionmaker.
     """
     if not is_async:
-        config_key = "SQLALCHEMY_ENGINES"
         make: t.Callable[..., t.Any] = orm.sessionmaker
     else:
-        config_key = "SQLALCHEMY_ASYNC_ENGINES"
-        make = sa_async.async_sessionmaker
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        make = async_sessionmaker
 
-    options = base.copy()
+    options = dict(base)
 
     if "default" in engines:
         options["bind"] = engines["default"]
 
-    if "binds" in options:
-        for base, bind in options["binds"].items():
+    binds: dict[t.Any, t.Any] | None = options.get("binds")
+
+    # Only rewrite the binds if some are engine names. Build a new dict rather
+    # than modifying the one from the options, which is shared by the sync and
+    # async sessionmakers, and by other apps.
+    if binds and any(isinstance(bind, str) for bind in binds.values()):
+        new_binds = {}
+
+        for model, bind in binds.items():
             if isinstance(bind, str):
+                # A name that is only configured for the other kind of engine
+                # does not apply to these sessions. _check_binds ensures each
+                # name is configured for at least one kind.
                 if bind not in engines:
-                    raise RuntimeError(
-                        f"'{config_key}[\"{bind}\"]' is not defined, but is"
-                        " used in 'session_options[\"binds\"]'."
-                    )
+                    continue
+
+                bind = engines[bind]
+
+            new_binds[model] = bind
 
-                options["binds"][base] = engines[bind]
+        options["binds"] = new_binds
 
     return make(**options)
@@ -30,7 +30,7 @@ def app(request: pytest.FixtureRequest, tmp_path: Path) -> cabc.Iterator[Flask]:
         pass
     else:
         with app.app_context():
-            engines = db.engines.values()
+            engines = tuple(db.engines.values())
 
         for engine in engines:
             engine.dispose()
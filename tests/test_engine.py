@@ -9,6 +9,7 @@ import pytest
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
 from flask import Flask
+from flask import g
 
 from flask_sqlalchemy_lite import SQLAlchemy
 
@@ -91,6 +92,23 @@ def test_engines_require_init() -> None:
         assert db.async_engines
 
 
+def test_state_cached(app: Flask, db: SQLAlchemy) -> None:
+    """The state is cached for the app context, and is not used by another
+    instance.
+    """
+    with app.app_context():
+        assert "_sqlalchemy_state" not in g
+        engine = db.engine
+        assert g._sqlalchemy_state[0] is db
+        assert db.engine is engine
+
+        with pytest.raises(RuntimeError, match="not registered"):
+            assert SQLAlchemy().engine
+
+    with app.app_context():
+        assert "_sqlalchemy_state" not in g
+
+
 @pytest.mark.usefixtures("db")
 def test_init_twice_fails(app: Flask) -> None:
     """Registering the same app twice fails."""
@@ -137,6 +155,18 @@ def test_init_engine_options(app: Flask) -> None:
     assert not db.engine.echo
 
 
+@pytest.mark.usefixtures("app_ctx")
+def test_init_engine_options_copied(app: Flask) -> None:
+    """Changing the top-level keys of the passed options dict after creating
+    the extension does not affect it.
+    """
+    engine_options = {"echo": True}
+    db = SQLAlchemy(engine_options=engine_options)
+    engine_options["echo"] = False
+    db.init_app(app)
+    assert db.engine.echo
+
+
 @pytest.mark.usefixtures("app_ctx")
 @pytest.mark.parametrize(
     "value",
@@ -216,6 +246,17 @@ def test_sqlite_memory_defaults(create_engine: mock.Mock, app: Flask) -> None:
     assert create_engine.call_args.kwargs["connect_args"]["check_same_thread"] is False
 
 
+@mock.patch("sqlalchemy.engine.create.create_engine", autospec=True)
+def test_sqlite_memory_skip_defaults(create_engine: mock.Mock, app: Flask) -> None:
+    """The connect args passed for an in-memory database are not overridden or
+    modified.
+    """
+    connect_args = {"check_same_thread": True}
+    SQLAlchemy(app, engine_options={"connect_args": connect_args})
+    assert create_engine.call_args.kwargs["connect_args"] == {"check_same_thread": True}
+    assert create_engine.call_args.kwargs["connect_args"] is not connect_args
+
+
 @mock.patch("sqlalchemy.engine.create.create_engine", autospec=True)
 def test_mysql_defaults(create_engine: mock.Mock, app: Flask) -> None:
     """Defaults are applied for the MySQL driver."""
@@ -235,3 +276,73 @@ def test_mysql_skip_defaults(create_engine: mock.Mock, app: Flask) -> None:
     SQLAlchemy(app)
     assert "pool_recycle" not in create_engine.call_args.kwargs
     assert create_engine.call_args.args[0].query["charset"] == "latin1"
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_queue_pool_lifo(app: Flask) -> None:
+    """LIFO is enabled for queue pools, but can be overridden."""
+    app.config["SQLALCHEMY_ENGINES"]["a"] = "sqlite:///a.db"
+    app.config["SQLALCHEMY_ENGINES"]["b"] = {
+        "url": "sqlite:///b.db",
+        "pool_use_lifo": False,
+    }
+    db = SQLAlchemy(app)
+    assert isinstance(db.engine.pool, sa.pool.StaticPool)
+    pool = db.engines["a"].pool
+    assert isinstance(pool, sa.pool.QueuePool)
+    assert pool._pool.use_lifo
+    pool = db.engines["b"].pool
+    assert isinstance(pool, sa.pool.QueuePool)
+    assert not pool._pool.use_lifo
+
+
+@mock.patch("sqlalchemy.engine.create.create_engine", autospec=True)
+def test_other_pool_no_lifo(create_engine: mock.Mock, app: Flask) -> None:
+    """LIFO is not set for pools that don't support it."""
+    app.config["SQLALCHEMY_ENGINES"]["default"] = {
+        "url": "postgresql:///test",
+        "poolclass": sa.pool.NullPool,
+    }
+    SQLAlchemy(app)
+    assert "pool_use_lifo" not in create_engine.call_args.kwargs
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_warm_pools(app: Flask) -> None:
+    """Queue pools can be filled during init. Other pools are skipped."""
+    app.config["SQLALCHEMY_ENGINES"]["a"] = {"url": "sqlite:///a.db", "pool_size": 2}
+    db = SQLAlchemy(app, warm_pools=True)
+    pool = db.engines["a"].pool
+    assert isinstance(pool, sa.pool.QueuePool)
+    assert pool.checkedin() == 2
+    assert pool.checkedout() == 0
+
+
+def test_warm_pools_error(app: Flask) -> None:
+    """If opening a connection fails while warming, the connections that were
+    already opened are closed, and the app is not registered so that init can
+    be tried again.
+    """
+    app.config["SQLALCHEMY_ENGINES"]["a"] = {"url": "sqlite:///a.db", "pool_size": 3}
+    connect = sa.Engine.connect
+    pools: list[sa.pool.Pool] = []
+
+    def fail_connect(engine: sa.Engine) -> sa.Connection:
+        pools.append(engine.pool)
+
+        if len(pools) == 2:
+            raise ValueError
+
+        return connect(engine)
+
+    with mock.patch.object(sa.Engine, "connect", fail_connect):
+        with pytest.raises(ValueError):
+            SQLAlchemy(app, warm_pools=True)
+
+    assert isinstance(pools[0], sa.pool.QueuePool)
+    assert pools[0].checkedout() == 0
+    assert pools[0].checkedin() == 0
+    assert "sqlalchemy" not in app.extensions
+    assert "_sqlalchemy_state" not in app.extensions
+    # init can be tried again
+    SQLAlchemy(app, warm_pools=True)
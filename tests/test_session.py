@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import typing as t
+from unittest import mock
+
 import pytest
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
@@ -96,6 +99,106 @@ def test_cleanup_sessions(app: Flask, db: SQLAlchemy) -> None:
     assert "_sqlalchemy_async_sessions" not in ctx.g
 
 
+def test_cleanup_async_sessions(app: Flask, db: SQLAlchemy) -> None:
+    """Async sessions are awaited when closed during teardown."""
+    ctx = app.app_context()
+    ctx.push()
+    session = db.async_session
+    session.add(Todo())
+
+    with mock.patch.object(session, "close") as close:
+        ctx.pop()
+
+    close.assert_awaited_once()
+
+
+def test_cleanup_unused_async_sessions(app: Flask, db: SQLAlchemy) -> None:
+    """Async sessions that are not in a transaction and hold no objects are not
+    closed.
+    """
+    ctx = app.app_context()
+    ctx.push()
+    session = db.async_session
+
+    with mock.patch.object(session, "close") as close:
+        ctx.pop()
+
+    close.assert_not_called()
+
+
+def test_cleanup_async_sessions_with_objects(app: Flask, db: SQLAlchemy) -> None:
+    """Async sessions that ended their transaction but still hold objects are
+    closed.
+    """
+    ctx = app.app_context()
+    ctx.push()
+    session = db.async_session
+    todo = Todo(id=1)
+    orm.make_transient_to_detached(todo)
+    session.sync_session.add(todo)
+    session.sync_session.rollback()
+    assert not session.in_transaction()
+
+    with mock.patch.object(session, "close") as close:
+        ctx.pop()
+
+    close.assert_awaited_once()
+
+
+def test_cleanup_sessions_error(app: Flask, db: SQLAlchemy) -> None:
+    """All sessions are closed even if closing one fails, then the first error
+    is raised.
+    """
+    ctx = app.app_context()
+    ctx.push()
+    default = db.session
+    other = db.get_session("a")
+
+    with mock.patch.object(default, "close", side_effect=ValueError) as close:
+        with mock.patch.object(other, "close") as other_close:
+            with pytest.raises(ValueError):
+                ctx.pop()
+
+    close.assert_called_once()
+    other_close.assert_called_once()
+
+
+def test_cleanup_mixed_sessions_error(app: Flask, db: SQLAlchemy) -> None:
+    """Async sessions are closed even if closing a sync session fails."""
+    ctx = app.app_context()
+    ctx.push()
+    session = db.session
+    async_session = db.async_session
+    async_session.add(Todo())
+
+    with mock.patch.object(session, "close", side_effect=ValueError):
+        with mock.patch.object(async_session, "close") as async_close:
+            with pytest.raises(ValueError):
+                ctx.pop()
+
+    async_close.assert_awaited_once()
+
+
+def test_cleanup_async_sessions_error(app: Flask, db: SQLAlchemy) -> None:
+    """All async sessions are closed even if closing one fails, then the first
+    error is raised.
+    """
+    ctx = app.app_context()
+    ctx.push()
+    default = db.async_session
+    default.add(Todo())
+    other = db.get_async_session("a")
+    other.add(Todo())
+
+    with mock.patch.object(default, "close", side_effect=ValueError) as close:
+        with mock.patch.object(other, "close") as other_close:
+            with pytest.raises(ValueError):
+                ctx.pop()
+
+    close.assert_awaited_once()
+    other_close.assert_awaited_once()
+
+
 def test_sessionmaker_configure(app: Flask, db: SQLAlchemy) -> None:
     """The sessionmaker can be reconfigured and persists across app contexts."""
     with app.app_context():
@@ -136,6 +239,47 @@ def test_session_binds(app: Flask) -> None:
     assert db.session.get_bind(Like) is external
 
 
+@pytest.mark.usefixtures("app_ctx")
+def test_async_session_binds(app: Flask) -> None:
+    """The binds session option uses async engines for async sessions, and
+    ignores names that are only sync engines. The passed binds are not modified.
+    """
+    app.config["SQLALCHEMY_ENGINES"]["a"] = "sqlite://"
+    app.config["SQLALCHEMY_ASYNC_ENGINES"]["b"] = "sqlite+aiosqlite://"
+    app.config["SQLALCHEMY_ENGINES"]["b"] = "sqlite://"
+    binds: dict[t.Any, t.Any] = {Base2: "a", Like: "b"}
+    db = SQLAlchemy(app, session_options={"binds": binds})
+    assert binds == {Base2: "a", Like: "b"}
+    assert db.session.get_bind(Post) is db.get_engine("a")
+    assert db.session.get_bind(Like) is db.get_engine("b")
+    session = db.async_session.sync_session
+    assert session.get_bind(Post) is db.async_engine.sync_engine
+    assert session.get_bind(Like) is db.get_async_engine("b").sync_engine
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_async_only_session_binds(app: Flask) -> None:
+    """A name that is only an async engine is bound for async sessions, and
+    ignored for sync sessions.
+    """
+    app.config["SQLALCHEMY_ASYNC_ENGINES"]["a"] = "sqlite+aiosqlite://"
+    db = SQLAlchemy(app, session_options={"binds": {Base2: "a"}})
+    assert db.session.get_bind(Post) is db.engine
+    session = db.async_session.sync_session
+    assert session.get_bind(Post) is db.get_async_engine("a").sync_engine
+
+
 def test_session_binds_invalid_engine(app: Flask) -> None:
-    with pytest.raises(RuntimeError, match="not defined"):
+    with pytest.raises(RuntimeError, match="Neither"):
         SQLAlchemy(app, session_options={"binds": {Post: "a"}})
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_async_sessionmaker_without_engines(app: Flask) -> None:
+    """The async sessionmaker is created on first access if no async engines
+    are configured.
+    """
+    del app.config["SQLALCHEMY_ASYNC_ENGINES"]
+    db = SQLAlchemy(app)
+    assert app.extensions["_sqlalchemy_state"].async_sessionmaker is None
+    assert db.async_sessionmaker is db.async_sessionmaker